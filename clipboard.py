@@ -1,62 +1,146 @@
 """
 clipboard.py — Cross-platform ComfyUI clipboard monitor
-Supports Windows (win32clipboard + PIL.ImageGrab) and Linux (GTK + pyperclip).
+Supports Windows (win32clipboard + PIL) and Linux (GTK + pyperclip).
 
-Polls the system clipboard every second and forwards new image or text content
-to a running ComfyUI instance via its HTTP API.
+Watches the system clipboard and forwards new image or text content to a
+running ComfyUI instance via its HTTP API. On Windows this is event-driven
+(WM_CLIPBOARDUPDATE via a message-only window); on Linux the clipboard is
+polled with adaptive back-off (100 ms right after a change, stretching to a
+2 s ceiling while idle).
 """
 
 import argparse
+import atexit
 import hashlib
+import io
 import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
 from PIL import Image
 
+# Sentinel returned by get_clipboard_image() when the clipboard still holds
+# the same raw bytes as the previous call — distinct from "no image at all".
+_SAME_IMAGE = object()
+
+# The raw-bytes fingerprint is pure change detection, so a non-cryptographic
+# hash is safe — and xxhash's XXH3 is roughly an order of magnitude faster
+# than MD5 on the multi-megabyte DIBs a screenshot produces. MD5 remains as
+# the fallback when xxhash is not installed.
+try:
+    import xxhash
+
+    def _fingerprint(data: bytes) -> bytes:
+        return xxhash.xxh3_64_digest(data)
+except ImportError:
+    def _fingerprint(data: bytes) -> bytes:
+        return hashlib.md5(data).digest()
+
+# orjson parses and serializes JSON several times faster than the stdlib —
+# worth it for the workflow template and the per-dispatch POST body. The
+# stdlib module remains as fallback.
+try:
+    import orjson
+
+    def _json_loads(text: str | bytes) -> dict:
+        return orjson.loads(text)
+
+    def _json_dumps(obj: dict) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_loads(text: str | bytes) -> dict:
+        return json.loads(text)
+
+    def _json_dumps(obj: dict) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
 # ---------------------------------------------------------------------------
 # Platform-specific imports and clipboard implementations
 # ---------------------------------------------------------------------------
 
 if sys.platform == "win32":
+    import ctypes
+
+    import win32api
     import win32clipboard
-    from PIL import ImageGrab
+    import win32gui
+    from PIL import BmpImagePlugin
 
-    def get_clipboard_image() -> Image.Image | None:
+    # Message sent to clipboard-format listeners whenever the clipboard changes
+    WM_CLIPBOARDUPDATE = 0x031D
+    # Makes GetMessage return 0, ending the message loop
+    WM_QUIT = 0x0012
+    # Pseudo-parent handle that creates a message-only window (no UI, no taskbar)
+    HWND_MESSAGE = -3
+
+    def _open_clipboard_with_retry(attempts: int = 5, delay: float = 0.01) -> bool:
         """
-        Retrieves an image from the Windows clipboard using win32clipboard.
-        Checks for CF_DIB format availability before attempting to grab.
-        Returns a PIL Image or None if no image is present / clipboard is busy.
+        Tries to open the clipboard a few times before giving up.
+
+        Every clipboard listener on the system (Win+V history, Ditto, ...)
+        receives the same WM_CLIPBOARDUPDATE and races to open the clipboard,
+        so brief contention is the normal case right after a copy — and with
+        no polling loop left to retry a second later, giving up on the first
+        attempt would silently drop the copy.
         """
-        try:
-            win32clipboard.OpenClipboard()
-            if win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_DIB):
-                image = ImageGrab.grabclipboard()
-                if isinstance(image, Image.Image):
-                    return image
-        except Exception:
-            pass  # Clipboard may be locked by another process — silently skip
-        finally:
+        for attempt in range(attempts):
             try:
-                win32clipboard.CloseClipboard()
+                win32clipboard.OpenClipboard()
+                return True
             except Exception:
-                pass
-        return None
+                if attempt + 1 < attempts:
+                    time.sleep(delay)
+        return False
 
-    def get_clipboard_text() -> str | None:
+    def read_clipboard() -> tuple[str, Image.Image | str | None] | None:
         """
-        Retrieves Unicode text from the Windows clipboard using win32clipboard.
-        Returns the text string or None if unavailable / clipboard is busy.
+        Reads the Windows clipboard with a single Open/Close pair.
+
+        The old get_clipboard_image()/get_clipboard_text() pair each opened
+        the clipboard separately — two cross-process round trips per poll,
+        plus a race window where the contents could change between the opens.
+        Image takes priority over text. The raw CF_DIB bytes are fingerprinted
+        before any decoding: when they match the previous call, ("unchanged",
+        None) is returned without paying for a BMP decode whose pixels would
+        be thrown away. Genuinely new bytes are decoded straight from the DIB
+        buffer (ImageGrab.grabclipboard() would re-open the clipboard
+        internally just to do the same thing).
+        Returns ("image", Image), ("text", str), ("unchanged", None),
+        ("busy", None) when another process holds the clipboard lock so
+        nothing could be read, or None if no supported format is present.
         """
+        global last_dib_hash
+        # IsClipboardFormatAvailable works without opening the clipboard, so
+        # an empty or unsupported clipboard is detected with two cheap
+        # syscalls and no cross-process OpenClipboard round trip at all.
+        has_img = win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_DIB)
+        has_txt = win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT)
+        if not (has_img or has_txt):
+            return None
+        if not _open_clipboard_with_retry():
+            return ("busy", None)
         try:
-            win32clipboard.OpenClipboard()
-            if win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT):
-                return win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT)
+            if has_img:
+                dib = win32clipboard.GetClipboardData(win32clipboard.CF_DIB)
+                dib_hash = _fingerprint(dib)
+                if dib_hash == last_dib_hash:
+                    return ("unchanged", None)
+                last_dib_hash = dib_hash
+                return ("image", BmpImagePlugin.DibImageFile(io.BytesIO(dib)))
+            if has_txt:
+                return ("text", win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT))
         except Exception:
-            pass
+            # Read failed mid-flight (owner revoked the data, delayed render
+            # failed, ...) — report busy, not empty, so nothing gets reset.
+            return ("busy", None)
         finally:
             try:
                 win32clipboard.CloseClipboard()
@@ -64,6 +148,53 @@ if sys.platform == "win32":
                 pass
         return None
 
+    def _clipboard_wnd_proc(hwnd, msg, wparam, lparam):
+        """Window procedure for the listener window: dispatches clipboard updates."""
+        if msg == WM_CLIPBOARDUPDATE:
+            process_clipboard()
+            return 0
+        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+
+    def run_clipboard_loop() -> None:
+        """
+        Blocks in a Windows message loop, reacting to WM_CLIPBOARDUPDATE events.
+
+        Instead of polling once per second (wasted work while idle, up to 1s of
+        latency on a copy), a hidden message-only window is registered as a
+        clipboard-format listener so process_clipboard() runs only when the
+        clipboard actually changes.
+        """
+        wc = win32gui.WNDCLASS()
+        wc.lpfnWndProc = _clipboard_wnd_proc
+        wc.lpszClassName = "ComfyUIClipboardListener"
+        wc.hInstance = win32gui.GetModuleHandle(None)
+        win32gui.RegisterClass(wc)
+
+        hwnd = win32gui.CreateWindowEx(
+            0, wc.lpszClassName, None, 0, 0, 0, 0, 0,
+            HWND_MESSAGE, 0, wc.hInstance, None,
+        )
+        if not ctypes.windll.user32.AddClipboardFormatListener(hwnd):
+            logging.error("AddClipboardFormatListener failed — cannot monitor clipboard.")
+            sys.exit(1)
+
+        # PumpMessages blocks in native GetMessage, where Python's deferred
+        # SIGINT is never delivered — a plain Ctrl+C would hang until the next
+        # clipboard event. Post WM_QUIT from the console handler instead so
+        # the loop wakes up and exits.
+        def _console_ctrl_handler(ctrl_type: int) -> bool:
+            win32gui.PostMessage(hwnd, WM_QUIT, 0, 0)
+            return True  # handled — don't let the default handler kill us
+
+        win32api.SetConsoleCtrlHandler(_console_ctrl_handler, True)
+        try:
+            win32gui.PumpMessages()
+        finally:
+            ctypes.windll.user32.RemoveClipboardFormatListener(hwnd)
+        # PumpMessages only returns after the WM_QUIT posted on Ctrl+C —
+        # surface it as the KeyboardInterrupt main() already expects.
+        raise KeyboardInterrupt
+
 else:  # Linux (and other GTK-capable platforms)
     import gi
     gi.require_version('Gtk', '3.0')
@@ -72,15 +203,20 @@ else:  # Linux (and other GTK-capable platforms)
     # GTK must be initialised before any clipboard or widget operations.
     Gtk.init([])
 
-    def get_clipboard_image() -> Image.Image | None:
+    def get_clipboard_image() -> Image.Image | None | object:
         """
         Retrieves an image from the Linux clipboard via GTK/GDK.
 
-        Handles both RGB and RGBA pixbufs correctly by checking get_has_alpha().
-        Strips GDK row-padding when rowstride exceeds the raw pixel row width,
-        which is common due to memory alignment requirements.
-        Returns a PIL Image or None if no image is present.
+        Fingerprints the pixbuf's raw buffer before any conversion — the hash
+        consumes the buffer directly (no tobytes()-style copy), so an
+        unchanged clipboard costs one hash rather than a full frombytes()
+        round trip. Handles both RGB and RGBA pixbufs correctly by checking
+        get_has_alpha(). Strips GDK row-padding when rowstride exceeds the
+        raw pixel row width, which is common due to memory alignment
+        requirements.
+        Returns a PIL Image, _SAME_IMAGE, or None if no image is present.
         """
+        global last_dib_hash
         clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
         pixbuf = clipboard.wait_for_image()
         if not pixbuf:
@@ -96,12 +232,18 @@ else:  # Linux (and other GTK-capable platforms)
         # Rowstride must be at least width * channels; GDK may add alignment padding
         if rowstride < width * n_channels:
             logging.warning(
-                f"Unexpected rowstride ({rowstride}) for {width}x{height} {mode} — skipping."
+                "Unexpected rowstride (%s) for %sx%s %s — skipping.",
+                rowstride, width, height, mode,
             )
             return None
 
         pixels = pixbuf.get_pixels()
 
+        pixel_hash = _fingerprint(pixels)
+        if pixel_hash == last_dib_hash:
+            return _SAME_IMAGE
+        last_dib_hash = pixel_hash
+
         if rowstride == width * n_channels:
             image = Image.frombytes(mode, (width, height), pixels)
         else:
@@ -126,9 +268,44 @@ else:  # Linux (and other GTK-capable platforms)
             text = clipboard.wait_for_text()
             return text if text else None
         except Exception as e:
-            logging.error(f"Error reading text from clipboard: {e}")
+            logging.error("Error reading text from clipboard: %s", e)
             return None
 
+    def read_clipboard() -> tuple[str, Image.Image | str | None] | None:
+        """
+        Reads the Linux clipboard: image first, then text — same tagged
+        result shape as the Windows implementation.
+        Returns ("image", Image), ("text", str), ("unchanged", None), or None
+        if the clipboard holds no supported content.
+        """
+        image = get_clipboard_image()
+        if image is _SAME_IMAGE:
+            return ("unchanged", None)
+        if image is not None:
+            return ("image", image)
+        text = get_clipboard_text()
+        if text is not None:
+            return ("text", text)
+        return None
+
+    def run_clipboard_loop() -> None:
+        """
+        Polls the clipboard with adaptive back-off: 100 ms right after a
+        change, so copy bursts are picked up quickly, stretching ~1.3x per
+        idle poll up to a 2 s ceiling while nothing happens.
+
+        GTK offers `owner-change` signals, but they require a running GLib main
+        loop and behave inconsistently across X11/Wayland clipboards, so the
+        Linux side keeps a polling loop.
+        """
+        delay = 0.1
+        while True:
+            if process_clipboard():
+                delay = 0.1
+            else:
+                delay = min(delay * 1.3, 2.0)
+            time.sleep(delay)
+
 # ---------------------------------------------------------------------------
 # Configuration — platform-appropriate defaults
 # ---------------------------------------------------------------------------
@@ -140,6 +317,9 @@ else:
     COMFY_DIR = Path.home() / "ComfyUI"   # e.g. /home/nk/ComfyUI
     COMFY_API = "http://127.0.0.1:3001/prompt"
 
+# Multipart upload endpoint, derived from the prompt endpoint's base URL
+COMFY_UPLOAD_API = COMFY_API.rsplit("/", 1)[0] + "/upload/image"
+
 INPUT_DIR = COMFY_DIR / "input" / "clipboard_images"
 WORKFLOWS_DIR = COMFY_DIR / "user" / "default" / "workflows" / "clipboard"
 WORKFLOW_TEMPLATE = WORKFLOWS_DIR / "default.json"  # overridden by --profile
@@ -148,146 +328,435 @@ WORKFLOW_TEMPLATE = WORKFLOWS_DIR / "default.json"  # overridden by --profile
 # Logging — file next to ComfyUI root + stdout
 # ---------------------------------------------------------------------------
 
+# The file and stream handlers hang off a QueueListener thread, so a logging
+# call on the monitor thread costs an enqueue rather than a synchronous disk
+# flush. delay=True defers opening the log file until the first record.
+_LOG_FORMATTER = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+# Log file sits next to clipboard.py — no dependency on COMFY_DIR existing
+_LOG_FILE_HANDLER = logging.FileHandler(
+    Path(__file__).parent / "clipboard.log", encoding="utf-8", delay=True
+)
+_LOG_FILE_HANDLER.setFormatter(_LOG_FORMATTER)
+_LOG_STREAM_HANDLER = logging.StreamHandler()
+_LOG_STREAM_HANDLER.setFormatter(_LOG_FORMATTER)
+
+_LOG_QUEUE: queue.Queue = queue.Queue(-1)
+_LOG_LISTENER = logging.handlers.QueueListener(
+    _LOG_QUEUE, _LOG_FILE_HANDLER, _LOG_STREAM_HANDLER
+)
+_LOG_LISTENER.start()
+atexit.register(_LOG_LISTENER.stop)
+
+# The QueueHandler needs a pass-through format: QueueHandler.prepare() bakes
+# its own formatter's rendering into the record before the listener-side
+# handlers run, so anything beyond %(message)s here (including the stdlib
+# default BASIC_FORMAT) would be duplicated inside every line _LOG_FORMATTER
+# produces.
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        # Log file sits next to clipboard.py — no dependency on COMFY_DIR existing
-        logging.FileHandler(Path(__file__).parent / "clipboard.log", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
+    format="%(message)s",
+    handlers=[logging.handlers.QueueHandler(_LOG_QUEUE)],
 )
 
 # ---------------------------------------------------------------------------
 # State tracking — detect clipboard changes across poll cycles
 # ---------------------------------------------------------------------------
 
-last_image_hash: str | None = None
+last_image_hash: int | None = None
 last_text_content: str | None = None
+# Fingerprint of the raw clipboard image bytes (CF_DIB on Windows, GDK pixbuf
+# buffer on Linux), compared before the bytes are ever decoded into pixels.
+last_dib_hash: bytes | None = None
+# Windows clipboard sequence number from the last processed poll/event.
+# 0 is never returned by GetClipboardSequenceNumber for a changed clipboard.
+last_seq: int = 0
 
 # ---------------------------------------------------------------------------
 # Shared utility functions
 # ---------------------------------------------------------------------------
 
-def get_image_hash(image: Image.Image) -> str:
-    """Returns an MD5 hex digest of raw pixel data, used for change detection."""
-    return hashlib.md5(image.tobytes()).hexdigest()
+def get_image_hash(image: Image.Image) -> int:
+    """
+    Returns a 64-bit dHash (difference hash) of the image, used for change detection.
+
+    The image is reduced to a 9x8 grayscale thumbnail and each bit records whether
+    a pixel is brighter than its right-hand neighbour. Unlike hashing the full
+    pixel buffer, this touches only 72 pixels per call — a copied 4K screenshot
+    no longer costs a multi-megabyte tobytes() round trip every poll cycle — and
+    the fingerprint survives trivial re-encodes of the same picture.
+    """
+    # reducing_gap lets PIL shrink huge screenshots with a cheap integer
+    # reduce pass before the final bilinear resample, instead of resampling
+    # the full-resolution plane directly down to 9x8.
+    small = image.convert("L").resize((9, 8), Image.BILINEAR, reducing_gap=2.0)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits
+
+
+# Target nodes patched per content type: workflow node title -> input key
+_TARGETS = {
+    "image": ("load_clipboard_image", "image"),
+    "text": ("load_clipboard_text", "text"),
+}
+
+# Cached workflow template, keyed by path: (mtime, raw JSON text,
+# {content type -> (node id, input key)}). Refreshed only when the file
+# changes on disk.
+_template_cache: dict[Path, tuple[float, str, dict[str, tuple[str, str]]]] = {}
+
+
+def _load_template(path: Path) -> tuple[str, dict[str, tuple[str, str]]]:
+    """
+    Returns the workflow template's raw JSON text and its dispatch routes
+    (content type → (node id, input key)), re-reading the file only when its
+    mtime changes.
+
+    create_api_prompt() runs on every clipboard event, so re-reading,
+    re-parsing and title-scanning the (potentially large) workflow JSON each
+    time is pure repeated work. Node ids are stable for a given template, so
+    the scan for the _TARGETS titles happens once per (re)load and each
+    dispatch becomes a constant-time dict write. The raw text is kept because
+    json.loads() on it is a cheaper way to get a fresh mutable copy than
+    copy.deepcopy() of the parsed template.
+    """
+    mtime = path.stat().st_mtime
+    cached = _template_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    text = path.read_text(encoding="utf-8")
+    template = _json_loads(text)
+    title_to_node_id = {
+        node["_meta"]["title"]: node_id
+        for node_id, node in template.items()
+        if isinstance(node, dict) and "title" in node.get("_meta", {})
+    }
+    routes = {
+        content_type: (title_to_node_id[title], input_key)
+        for content_type, (title, input_key) in _TARGETS.items()
+        if title in title_to_node_id
+    }
+    _template_cache[path] = (mtime, text, routes)
+    return text, routes
 
 
 def create_api_prompt(content, content_type: str, workflow_path: Path | None = None) -> dict | None:
     """
-    Loads the ComfyUI API-format workflow JSON and patches the node that
-    matches the target title ('load_clipboard_image' or 'load_clipboard_text').
+    Builds an API prompt from the (cached) workflow JSON and patches the node
+    that matches the target title ('load_clipboard_image' or 'load_clipboard_text').
 
     For images, content should be a Path to the saved file.
     For text, content should be the raw string.
     workflow_path overrides the global WORKFLOW_TEMPLATE (used for --profile).
     Returns the patched prompt dict, or None for unknown content types.
     """
+    if content_type not in _TARGETS:
+        logging.error("Unknown content_type '%s' — cannot build API prompt.", content_type)
+        return None
+
     path = workflow_path or WORKFLOW_TEMPLATE
-    with open(path, "r", encoding="utf-8") as f:
-        prompt = json.load(f)
+    template_text, routes = _load_template(path)
+    prompt = _json_loads(template_text)
 
     if content_type == "image":
-        target_title = "load_clipboard_image"
-        target_input = "image"
         # ComfyUI expects a path relative to its own `input/` directory
         new_value = f"{INPUT_DIR.name}/{content.name}".replace("\\", "/")
-    elif content_type == "text":
-        target_title = "load_clipboard_text"
-        target_input = "text"
-        new_value = content
     else:
-        logging.error(f"Unknown content_type '{content_type}' — cannot build API prompt.")
-        return None
+        new_value = content
 
     # Only patch the target node — resetting the opposite node (e.g. clearing the
     # image node when text arrives) is not safe because LoadImage requires a valid
     # file path and crashes on an empty string. Handle input switching inside the
     # workflow itself using a bypass or primitive switch node.
-    node_found = False
-    for node_id, node_data in prompt.items():
-        if not isinstance(node_data, dict):
-            continue
-        if node_data.get("_meta", {}).get("title") == target_title:
-            prompt[node_id]["inputs"][target_input] = new_value
-            logging.info(f"Updated node '{target_title}' (ID: {node_id}) with new {content_type}.")
-            node_found = True
-            break
-
-    if not node_found:
+    route = routes.get(content_type)
+    if route is not None:
+        node_id, input_key = route
+        prompt[node_id]["inputs"][input_key] = new_value
+        logging.info(
+            "Updated node '%s' (ID: %s) with new %s.",
+            _TARGETS[content_type][0], node_id, content_type,
+        )
+    else:
         logging.warning(
-            f"Node '{target_title}' not found in workflow — "
-            f"the {content_type} from clipboard will not be processed."
+            "Node '%s' not found in workflow — "
+            "the %s from clipboard will not be processed.",
+            _TARGETS[content_type][0], content_type,
         )
 
     return {"prompt": prompt, "client_id": "clipboard_script"}
 
 
+# One keep-alive session shared by all API calls. A bare requests.post()
+# builds a new connection pool and TCP connection per dispatch; reusing the
+# session keeps the socket to ComfyUI open between clipboard events.
+# pool_maxsize must cover every concurrent user — the two api-post pool
+# workers plus the dispatch worker's image upload — or urllib3 discards
+# connections ("Connection pool is full") instead of keeping them alive.
+_SESSION = requests.Session()
+_SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+
+# POSTs run on their own small pool so a slow ComfyUI response never stalls
+# the dispatch worker between jobs. ComfyUI only returns a queue
+# acknowledgement, so nothing downstream waits on the result.
+_POST_EXEC = ThreadPoolExecutor(max_workers=2, thread_name_prefix="api-post")
+_MAX_PENDING_POSTS = 4
+
+
 def send_to_api(workflow_prompt: dict | None) -> None:
-    """POSTs the prepared workflow prompt to the ComfyUI HTTP API."""
+    """
+    Submits the prepared workflow prompt for fire-and-forget delivery to the
+    ComfyUI HTTP API. Returns immediately; the blocking POST runs on
+    _POST_EXEC. Drops the prompt when too many POSTs are already pending
+    (ComfyUI unresponsive) rather than queueing without bound.
+    """
     if not workflow_prompt:
         logging.error("Workflow prompt is empty — nothing sent to API.")
         return
+    # _work_queue is private but is the executor's actual backlog — a cheap,
+    # good-enough backpressure probe.
+    if _POST_EXEC._work_queue.qsize() >= _MAX_PENDING_POSTS:
+        logging.warning("API POST backlog full — dropping this dispatch.")
+        return
+    _POST_EXEC.submit(_post_prompt, workflow_prompt)
+
+
+def _post_prompt(workflow_prompt: dict) -> None:
+    """Performs the blocking POST; runs on the _POST_EXEC pool."""
     try:
-        logging.debug(f"Sending API prompt: {json.dumps(workflow_prompt, indent=2)}")
-        response = requests.post(COMFY_API, json=workflow_prompt, timeout=10)
+        # %-style args defer formatting, so nothing is built when DEBUG is off
+        logging.debug("Sending API prompt: %s", workflow_prompt)
+        response = _SESSION.post(
+            COMFY_API,
+            data=_json_dumps(workflow_prompt),
+            headers={"Content-Type": "application/json"},
+            timeout=10,
+        )
         response.raise_for_status()
-        logging.info(f"ComfyUI API response: {response.json()}")
+        logging.info("ComfyUI API response: %s", response.json())
     except requests.exceptions.Timeout:
-        logging.error(f"Request to ComfyUI API timed out ({COMFY_API}).")
+        logging.error("Request to ComfyUI API timed out (%s).", COMFY_API)
     except Exception as e:
-        logging.error(f"Error sending workflow to API: {e}")
+        logging.error("Error sending workflow to API: %s", e)
 
 # ---------------------------------------------------------------------------
-# Main poll cycle
+# Background dispatch — PNG encode and HTTP POST happen off the monitor thread
 # ---------------------------------------------------------------------------
 
-def process_clipboard() -> None:
+# Jobs are ("image", Image, Path) or ("text", str, None). Bounded so a stalled
+# ComfyUI cannot grow memory without limit; duplicate suppression keeps the
+# queue near-empty in normal use.
+_WORK_Q: queue.Queue = queue.Queue(maxsize=8)
+
+
+# Reusable PNG encode buffer. Only the dispatch worker touches it, so one
+# module-level buffer is safe — and a long-running monitor stops churning the
+# allocator with a fresh multi-megabyte buffer per save.
+_ENC_BUF = io.BytesIO()
+
+
+def _encode_png(image: Image.Image) -> memoryview:
     """
-    Single clipboard poll: checks for image first, then text.
-    Skips processing if content matches the last seen hash / string.
-    Resets both trackers when the clipboard becomes empty or unsupported.
+    Encodes the image as PNG into the shared buffer and returns a view of it.
+    Callers must release() the view before the next encode — BytesIO refuses
+    to resize while a view is exported.
+
+    zlib level 1 is used because the default level 6 dominates encode time on
+    screenshots, and optimize=True would deflate twice.
     """
-    global last_image_hash, last_text_content
+    _ENC_BUF.seek(0)
+    _ENC_BUF.truncate()
+    image.save(_ENC_BUF, format="PNG", compress_level=1, optimize=False)
+    return _ENC_BUF.getbuffer()
 
-    # 1. Image takes priority over text
-    image = get_clipboard_image()
-    if image:
-        current_hash = get_image_hash(image)
-        if current_hash == last_image_hash:
-            return  # Same image — nothing to do
 
-        logging.info(f"New image detected (hash: {current_hash[:8]}...). Processing.")
-        last_image_hash = current_hash
-        last_text_content = None  # Clear text tracker
+def _upload_image(png_data: memoryview, filename: str) -> bool:
+    """
+    Uploads already-encoded PNG bytes to ComfyUI's /upload/image endpoint.
+    Compared to dropping the file into input/ ourselves, this skips one disk
+    write here and one disk read on ComfyUI's side. Returns True on success;
+    callers fall back to the filesystem on False.
+    """
+    try:
+        response = _SESSION.post(
+            COMFY_UPLOAD_API,
+            files={"image": (filename, png_data, "image/png")},
+            data={"subfolder": INPUT_DIR.name, "overwrite": "true"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        logging.info("Image uploaded to ComfyUI as %s/%s.", INPUT_DIR.name, filename)
+        return True
+    except Exception as e:
+        logging.warning("Upload to %s failed (%s) — falling back to a direct file write.", COMFY_UPLOAD_API, e)
+        return False
 
-        INPUT_DIR.mkdir(parents=True, exist_ok=True)
-        image_path = INPUT_DIR / f"clipboard_{int(time.time())}.png"
-        image.save(image_path)
-        logging.info(f"Image saved to: {image_path}")
 
-        send_to_api(create_api_prompt(image_path, "image"))
-        return
+def _dispatch_worker() -> None:
+    """Daemon loop: pops clipboard jobs and performs the save / POST they need."""
+    while True:
+        kind, content, image_path = _WORK_Q.get()
+        try:
+            if kind == "image":
+                png = _encode_png(content)
+                try:
+                    if not _upload_image(png, image_path.name):
+                        image_path.parent.mkdir(parents=True, exist_ok=True)
+                        # Write the already-encoded bytes to a temp name on
+                        # the same volume, then atomically swap in so ComfyUI
+                        # can never observe a half-written PNG.
+                        tmp_path = image_path.with_suffix(".png.part")
+                        tmp_path.write_bytes(png)
+                        os.replace(tmp_path, image_path)
+                        logging.info("Image saved to: %s", image_path)
+                finally:
+                    png.release()
+                send_to_api(create_api_prompt(image_path, "image"))
+            else:
+                send_to_api(create_api_prompt(content, "text"))
+        except Exception as e:
+            logging.error("Error dispatching clipboard %s: %s", kind, e)
+        finally:
+            _WORK_Q.task_done()
 
-    # 2. No image — check for text
-    text = get_clipboard_text()
-    if text and text.strip():
-        if text == last_text_content:
-            return  # Same text — nothing to do
 
-        logging.info(f"New text detected: '{text[:50]}...'. Processing.")
-        last_text_content = text
-        last_image_hash = None  # Clear image tracker
+def _enqueue_job(job: tuple) -> None:
+    """Hands a job to the dispatch worker, dropping the oldest one if full."""
+    try:
+        _WORK_Q.put_nowait(job)
+    except queue.Full:
+        try:
+            dropped = _WORK_Q.get_nowait()
+            logging.warning("Dispatch queue full — dropping pending %s job.", dropped[0])
+        except queue.Empty:
+            pass
+        _WORK_Q.put_nowait(job)
 
-        send_to_api(create_api_prompt(text, "text"))
-        return
 
-    # 3. Clipboard is empty or holds an unsupported format — reset trackers
+# Debounce window for copy bursts. A multi-step copy (screenshot, then
+# immediately a better region) would otherwise fire a GPU workflow for the
+# interstitial content; instead each new job replaces the pending one and
+# only ships once the clipboard has been quiet for this long.
+_DEBOUNCE_S = 0.4
+
+_debounce_lock = threading.Lock()
+_debounce_timer: threading.Timer | None = None
+_pending_job: tuple | None = None
+
+
+def _flush_pending_job(timer: threading.Timer) -> None:
+    """
+    Timer callback: moves the settled job onto the worker queue — but only if
+    this timer is still the current one. cancel() cannot stop a callback that
+    has already started running, so a copy arriving just as the timer fires
+    could otherwise see its fresh job dispatched by the stale callback,
+    skipping the quiet window it was owed.
+    """
+    global _pending_job
+    with _debounce_lock:
+        if timer is not _debounce_timer:
+            return  # superseded — a newer timer owns the pending job
+        job, _pending_job = _pending_job, None
+    if job is not None:
+        _enqueue_job(job)
+
+
+def _schedule_job(job: tuple) -> None:
+    """
+    Debounced hand-off to the dispatch worker: (re)arms the timer for this
+    job, replacing whatever was pending, so only the final item of a rapid
+    copy burst reaches ComfyUI.
+    """
+    global _debounce_timer, _pending_job
+    with _debounce_lock:
+        _pending_job = job
+        if _debounce_timer is not None:
+            _debounce_timer.cancel()
+        timer = threading.Timer(_DEBOUNCE_S, lambda: _flush_pending_job(timer))
+        timer.daemon = True
+        _debounce_timer = timer
+        timer.start()
+
+
+# ---------------------------------------------------------------------------
+# Main poll cycle
+# ---------------------------------------------------------------------------
+
+def process_clipboard() -> bool:
+    """
+    Single clipboard poll: reads the clipboard once (image takes priority
+    over text) and skips processing if content matches the last seen
+    hash / string. Resets the trackers when the clipboard becomes empty or
+    unsupported. Returns True when new content was dispatched — the polling
+    loop uses this to snap its back-off delay down.
+    """
+    global last_image_hash, last_text_content, last_dib_hash, last_seq
+
+    # 0. Windows: the clipboard sequence number changes iff the clipboard
+    # contents change. One syscall — no need to even open the clipboard when
+    # nothing happened since the last call.
+    if sys.platform == "win32":
+        seq = ctypes.windll.user32.GetClipboardSequenceNumber()
+        if seq == last_seq:
+            return False
+        last_seq = seq
+
+    result = read_clipboard()
+    if result:
+        kind, content = result
+
+        # 1. Another listener held the clipboard lock and nothing was read —
+        # rewind the sequence number so the event is not treated as consumed
+        # (0 never matches a live sequence number), and leave the trackers
+        # alone so this is not mistaken for an emptied clipboard.
+        if kind == "busy":
+            last_seq = 0
+            return False
+
+        # 2. Same raw clipboard bytes as last time — nothing to do
+        if kind == "unchanged":
+            return False
+
+        # 3. New image — dHash guards against re-encoded duplicates
+        if kind == "image":
+            current_hash = get_image_hash(content)
+            if current_hash == last_image_hash:
+                return False  # Same image — nothing to do
+
+            logging.info("New image detected (dHash: %016x). Processing.", current_hash)
+            last_image_hash = current_hash
+            last_text_content = None  # Clear text tracker
+
+            # Copy so the worker owns its pixels — the monitor thread moves on
+            # immediately while the PNG encode and POST happen in the background.
+            image_path = INPUT_DIR / f"clipboard_{int(time.time())}.png"
+            _schedule_job(("image", content.copy(), image_path))
+            return True
+
+        # 4. New text (ignore whitespace-only content)
+        if kind == "text" and content.strip():
+            if content == last_text_content:
+                return False  # Same text — nothing to do
+
+            logging.info("New text detected: '%.50s...'. Processing.", content)
+            last_text_content = content
+            last_image_hash = None  # Clear image trackers
+            last_dib_hash = None
+
+            _schedule_job(("text", content, None))
+            return True
+
+    # 5. Clipboard is empty or holds an unsupported format — reset trackers
     if last_image_hash is not None or last_text_content is not None:
         logging.info("Clipboard empty or unsupported format — resetting trackers.")
         last_image_hash = None
+        last_dib_hash = None
         last_text_content = None
+    return False
 
 
 def parse_args() -> argparse.Namespace:
@@ -315,7 +784,7 @@ def parse_args() -> argparse.Namespace:
 
 
 def main() -> None:
-    """Entry point: parses args, validates paths, starts the polling loop."""
+    """Entry point: parses args, validates paths, starts the clipboard monitor."""
     global WORKFLOW_TEMPLATE, last_image_hash, last_text_content
 
     args = parse_args()
@@ -323,7 +792,7 @@ def main() -> None:
 
     # Validate ComfyUI directory first — needed for both --list-profiles and normal run
     if not COMFY_DIR.exists():
-        logging.error(f"ComfyUI directory not found: {COMFY_DIR}")
+        logging.error("ComfyUI directory not found: %s", COMFY_DIR)
         logging.error("Update COMFY_DIR in the configuration section and try again.")
         sys.exit(1)
 
@@ -331,46 +800,46 @@ def main() -> None:
     if args.list_profiles:
         profiles = sorted(WORKFLOWS_DIR.glob("*.json"))
         if not profiles:
-            logging.info(f"No workflow profiles found in: {WORKFLOWS_DIR}")
+            logging.info("No workflow profiles found in: %s", WORKFLOWS_DIR)
         else:
-            logging.info(f"Available profiles in {WORKFLOWS_DIR}:")
+            logging.info("Available profiles in %s:", WORKFLOWS_DIR)
             for p in profiles:
                 marker = " ← default" if p.name == "default.json" else ""
-                logging.info(f"  --profile {p.stem}{marker}")
+                logging.info("  --profile %s%s", p.stem, marker)
         sys.exit(0)
 
     # Resolve workflow path from --profile or use default
     if args.profile:
         WORKFLOW_TEMPLATE = WORKFLOWS_DIR / f"{args.profile}.json"
-        logging.info(f"Using profile: {args.profile} ({WORKFLOW_TEMPLATE.name})")
+        logging.info("Using profile: %s (%s)", args.profile, WORKFLOW_TEMPLATE.name)
     # else: WORKFLOW_TEMPLATE stays as the global default
 
     if not WORKFLOW_TEMPLATE.exists():
-        logging.error(f"Workflow template not found: {WORKFLOW_TEMPLATE}")
+        logging.error("Workflow template not found: %s", WORKFLOW_TEMPLATE)
         if args.profile:
-            logging.error(f"Run with --list-profiles to see available profiles.")
+            logging.error("Run with --list-profiles to see available profiles.")
         else:
-            logging.error(f"Expected folder: {WORKFLOWS_DIR}")
+            logging.error("Expected folder: %s", WORKFLOWS_DIR)
             logging.error("Save your workflow via ComfyUI: Save > Save (API format) → save as 'default.json' in that folder.")
         sys.exit(1)
 
     # Pre-load current clipboard state so the first poll does not trigger a workflow.
     # Without this, whatever is in the clipboard at launch would be sent to ComfyUI immediately.
-    _init_image = get_clipboard_image()
-    if _init_image:
-        last_image_hash = get_image_hash(_init_image)
-        logging.info("Startup: existing clipboard image ignored.")
-    else:
-        _init_text = get_clipboard_text()
-        if _init_text:
-            last_text_content = _init_text
-            logging.info(f"Startup: existing clipboard text ignored ('{_init_text[:40]}...').")
-
-    logging.info(f"Clipboard monitor started ({platform_label}) — profile: {WORKFLOW_TEMPLATE.stem}. Press Ctrl+C to stop.")
+    _init = read_clipboard()
+    if _init:
+        _init_kind, _init_content = _init
+        if _init_kind == "image":
+            last_image_hash = get_image_hash(_init_content)
+            logging.info("Startup: existing clipboard image ignored.")
+        elif _init_kind == "text":
+            last_text_content = _init_content
+            logging.info("Startup: existing clipboard text ignored ('%.40s...').", _init_content)
+
+    threading.Thread(target=_dispatch_worker, daemon=True, name="clipboard-dispatch").start()
+
+    logging.info("Clipboard monitor started (%s) — profile: %s. Press Ctrl+C to stop.", platform_label, WORKFLOW_TEMPLATE.stem)
     try:
-        while True:
-            process_clipboard()
-            time.sleep(1)
+        run_clipboard_loop()
     except KeyboardInterrupt:
         logging.info("Clipboard monitor stopped by user.")
 